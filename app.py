@@ -1,11 +1,34 @@
+import io
 import os
+import sys
+import csv
 import json
+import time
+import uuid
+import hmac
+import base64
+import logging
+import threading
 import requests
+from contextlib import asynccontextmanager
+from collections import OrderedDict
+from dataclasses import fields
 from dotenv import load_dotenv
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, Query, HTTPException, Request, Header
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from groq import Groq
 from fastapi.middleware.cors import CORSMiddleware
+import xlsxwriter
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
+from reportlab.lib.pagesizes import letter
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet
+from records import EmployeeRecord, CompanyRecord, MISSING, country_name
+from query_log import (
+    QueryLog, RateBudget, canonical_query, normalize_query, mask_filters, dsl_hash, read_entries, prewarm_candidates,
+    simulate_hit_rates, QUERY_LOG_PATH, QUERY_LOG_MAX_BYTES, QUERY_LOG_BACKUPS,
+)
 
 # ------------------------
 # Load environment variables
@@ -13,9 +36,29 @@ from fastapi.middleware.cors import CORSMiddleware
 load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 CORESIGNAL_API_KEY = os.getenv("CORESIGNAL_API_KEY")
+RESULT_TTL_SECONDS = int(os.getenv("RESULT_TTL_SECONDS", "1800"))
+RESULT_STORE_MAX_BYTES = int(os.getenv("RESULT_STORE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", str(12 * 3600)))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+UPSTREAM_CACHE_MAX_BYTES = int(os.getenv("UPSTREAM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+PREWARM_ON_STARTUP = os.getenv("PREWARM_ON_STARTUP", "false").lower() == "true"
+PREWARM_TOP_N = int(os.getenv("PREWARM_TOP_N", "20"))
+PREWARM_RATE = float(os.getenv("PREWARM_RATE", "0.5"))
+PREWARM_MAX_CALLS = int(os.getenv("PREWARM_MAX_CALLS", "200"))
+# Shared secret for POST /prewarm; without one, the endpoint only accepts requests from localhost
+PREWARM_TOKEN = os.getenv("PREWARM_TOKEN", "")
+
+logger = logging.getLogger("uvicorn.error")
+
+@asynccontextmanager
+async def lifespan(app):
+    report_startup_hit_rates()
+    if PREWARM_ON_STARTUP:
+        start_prewarm(PREWARM_TOP_N, PREWARM_RATE, PREWARM_MAX_CALLS)
+    yield
 
 client = Groq(api_key=GROQ_API_KEY)
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS for Streamlit
 app.add_middleware(
@@ -71,8 +114,10 @@ def parse_query_with_llm(user_query: str):
         filters = {"type": "unknown", "raw_text": parsed_text}
     return filters
 
-def fetch_employees(filters):
-    url = "https://api.coresignal.com/cdapi/v2/employee_clean/search/es_dsl/preview"
+EMPLOYEE_SEARCH_URL = "https://api.coresignal.com/cdapi/v2/employee_clean/search/es_dsl/preview"
+COMPANY_SEARCH_URL = "https://api.coresignal.com/cdapi/v2/company_clean/search/es_dsl/preview"
+
+def build_employee_dsl(filters):
     must_clauses = []
     if "company" in filters:
         must_clauses.append({"match": {"company_name": filters["company"]}})
@@ -81,26 +126,18 @@ def fetch_employees(filters):
     if "skills" in filters:
         for skill in filters["skills"]:
             must_clauses.append({"match": {"skills": skill}})
-    payload = {"query": {"bool": {"must": must_clauses}}} if must_clauses else {"query": {"match_all": {}}}
+    return {"query": {"bool": {"must": must_clauses}}} if must_clauses else {"query": {"match_all": {}}}
+
+def fetch_employees(filters):
     headers = {"Content-Type": "application/json", "apikey": CORESIGNAL_API_KEY}
-    response = requests.post(url, headers=headers, json=payload)
+    response = requests.post(EMPLOYEE_SEARCH_URL, headers=headers, json=build_employee_dsl(filters))
     if response.status_code != 200:
         return []
     data = response.json()
     employees_list = data if isinstance(data, list) else data.get("employees", data.get("hits", data.get("results", [])))
-    results = []
-    for e in employees_list:
-        results.append({
-            "Name": e.get("full_name", "N/A"),
-            "Title": e.get("job_title", "N/A"),
-            "Company": e.get("company_name", "N/A"),
-            "Location": e.get("location_country", "N/A"),
-            "Connections": e.get("connections_count", "N/A")
-        })
-    return results
+    return [EmployeeRecord.from_coresignal(e) for e in employees_list]
 
-def fetch_companies(filters):
-    url = "https://api.coresignal.com/cdapi/v2/company_clean/search/es_dsl/preview"
+def build_company_dsl(filters):
     must_clauses = []
     if "keywords" in filters:
         must_clauses.append({"query_string": {"query": " ".join(filters["keywords"]), "default_field": "categories_and_keywords","default_operator": "AND"}})
@@ -110,28 +147,22 @@ def fetch_companies(filters):
         must_clauses.append({"match": {"location_hq_country": filters["location"]}})
     if "min_employees" in filters:
         must_clauses.append({"range": {"size_range": {"gte": filters["min_employees"]}}})
-    payload = {"query": {"bool": {"must": must_clauses}}} if must_clauses else {"query": {"match_all": {}}}
+    return {"query": {"bool": {"must": must_clauses}}} if must_clauses else {"query": {"match_all": {}}}
+
+def fetch_companies(filters):
     headers = {"Content-Type": "application/json", "apikey": CORESIGNAL_API_KEY}
-    response = requests.post(url, headers=headers, json=payload)
+    response = requests.post(COMPANY_SEARCH_URL, headers=headers, json=build_company_dsl(filters))
     if response.status_code != 200:
         return []
     data = response.json()
     companies_list = data if isinstance(data, list) else data.get("companies", data.get("hits", data.get("results", [])))
-    results = []
-    for c in companies_list:
-        results.append({
-            "Name": c.get("name", "N/A"),
-            "Industry": c.get("industry", "N/A"),
-            "Size": c.get("size_range", "N/A"),
-            "Location": c.get("location_hq_country", "N/A"),
-            "Website": c.get("websites_main") or c.get("website_main") or c.get("website", "N/A")
-        })
-    return results
+    return [CompanyRecord.from_coresignal(c) for c in companies_list]
 
 def summarize_results(results, user_query, query_type):
     if not results:
         return "No results found."
-    context = "\n".join([f"- {r['Name']} ({r.get('Title', r.get('Industry', ''))} at {r.get('Company', r.get('Location',''))}, {r['Location']})" for r in results])
+    rows = [r.to_display() for r in results]
+    context = "\n".join([f"- {r['Name']} ({r.get('Title', r.get('Industry', ''))} at {r.get('Company', r.get('Location',''))}, {r['Location']})" for r in rows])
     prompt = f"""
     User asked: {user_query}
     Here are the {query_type}s found:
@@ -145,6 +176,311 @@ def summarize_results(results, user_query, query_type):
     )
     return response.choices[0].message.content.strip()
 
+# ------------------------
+# Stage caches (parsed filters, upstream responses, summaries)
+# ------------------------
+def records_size(results):
+    """Approximates the memory held by a result set: the list, each record and its field values."""
+    size = sys.getsizeof(results)
+    for r in results:
+        size += sys.getsizeof(r) + sum(sys.getsizeof(getattr(r, f.name)) for f in fields(r))
+    return size
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a fixed TTL; counts hits and misses.
+
+    With max_bytes set, entries are also evicted once their total sizeof(value) exceeds it."""
+
+    def __init__(self, ttl_seconds, max_entries, max_bytes=None, sizeof=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or sys.getsizeof
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                self._discard(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds, size)
+            self._bytes += size
+            # Always keep the newest entry, even if it alone exceeds the byte budget
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[2]
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+filters_cache = TTLCache(CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES)
+# Result lists dwarf parsed filters and summaries, so the upstream cache is also bounded by memory
+upstream_cache = TTLCache(CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES, max_bytes=UPSTREAM_CACHE_MAX_BYTES, sizeof=records_size)
+summary_cache = TTLCache(CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES)
+
+def cached_parse(query, refresh=False):
+    key = canonical_query(query)
+    filters = None if refresh else filters_cache.get(key)
+    if filters is not None:
+        return filters, True
+    filters = parse_query_with_llm(query)
+    # Unparseable LLM output is not worth keeping around
+    if filters.get("type") in ("company", "employee"):
+        filters_cache.set(key, filters)
+    return filters, False
+
+def search_dsl(filters):
+    query_type = filters.get("type")
+    payload = build_company_dsl(filters) if query_type == "company" else build_employee_dsl(filters)
+    return dsl_hash(query_type, payload)
+
+def cached_fetch(filters, refresh=False):
+    key = search_dsl(filters)
+    results = None if refresh else upstream_cache.get(key)
+    if results is not None:
+        return results, key, True
+    results = fetch_companies(filters) if filters.get("type") == "company" else fetch_employees(filters)
+    # Empty results may just be a failed upstream call, so only real hits are cached
+    if results:
+        upstream_cache.set(key, results)
+    return results, key, False
+
+def cached_summary(results, query, query_type, dsl_key, refresh=False):
+    key = f"{dsl_key}:{canonical_query(query)}"
+    summary = None if refresh else summary_cache.get(key)
+    if summary is not None:
+        return summary, True
+    summary = summarize_results(results, query, query_type)
+    if results:
+        summary_cache.set(key, summary)
+    return summary, False
+
+# ------------------------
+# Query log & prewarming
+# ------------------------
+query_log = QueryLog(QUERY_LOG_PATH, QUERY_LOG_MAX_BYTES, QUERY_LOG_BACKUPS)
+prewarm_lock = threading.Lock()
+last_prewarm = {}
+
+def prewarm(top_n, rate, max_calls):
+    """Refreshes the parsed filters, Coresignal responses and summaries of the most frequent logged
+    searches and DSL payloads, spending one call of the budget per stage.
+
+    Logged queries are canonical, so for unmasked entries they are the exact cache keys live traffic uses."""
+    entries = read_entries(QUERY_LOG_PATH)
+    budget = RateBudget(rate, max_calls)
+    started = time.monotonic()
+    refreshed = {"filters": set(), "upstream": set(), "summary": set()}
+
+    # Popular DSL payloads can be reached from many differently worded queries
+    for entry in prewarm_candidates(entries, top_n):
+        query = entry["query"]
+        if query in refreshed["filters"]:
+            continue
+        if not budget.acquire():
+            break
+        filters, _ = cached_parse(query, refresh=True)
+        refreshed["filters"].add(query)
+        query_type = filters.get("type")
+        if query_type not in ("company", "employee"):
+            continue
+
+        key = search_dsl(filters)
+        if key in refreshed["upstream"]:
+            results, key, _ = cached_fetch(filters)
+        elif budget.acquire():
+            results, key, _ = cached_fetch(filters, refresh=True)
+            refreshed["upstream"].add(key)
+        else:
+            break
+
+        # Empty results are not cached upstream, so their summaries are not cached either
+        if not results:
+            continue
+        if not budget.acquire():
+            break
+        cached_summary(results, query, query_type, key, refresh=True)
+        refreshed["summary"].add(f"{key}:{query}")
+
+    last_prewarm.update({
+        **{stage: len(keys) for stage, keys in refreshed.items()},
+        "calls": budget.used,
+        "seconds": round(time.monotonic() - started, 1),
+    })
+    logger.info("Prewarm finished: %s", last_prewarm)
+
+def start_prewarm(top_n, rate, max_calls):
+    if not prewarm_lock.acquire(blocking=False):
+        return False
+
+    def run():
+        try:
+            prewarm(top_n, rate, max_calls)
+        except Exception:
+            logger.exception("Prewarm failed")
+        finally:
+            prewarm_lock.release()
+
+    threading.Thread(target=run, name="prewarm", daemon=True).start()
+    return True
+
+def report_startup_hit_rates():
+    report = simulate_hit_rates(read_entries(QUERY_LOG_PATH), PREWARM_TOP_N)
+    if not report["lookups"]:
+        logger.info("Startup hit rate: not enough query log history yet")
+        return
+    logger.info(
+        "Startup hit rate over %d days (first searches of each day), cold vs. prewarmed with top-%d: %s",
+        report["days"], PREWARM_TOP_N, "; ".join(
+            f"{stage} {100 * report['cold'][stage]:.1f}% vs. {100 * report['prewarmed'][stage]:.1f}%"
+            for stage in report["cold"]
+        ),
+    )
+
+# ------------------------
+# Server-side result store
+# ------------------------
+FACET_FIELDS = ("Location", "Size", "Connections")
+MAX_PAGE_SIZE = 200
+
+class ResultStore:
+    """Keeps result sets under opaque handles, expiring them after a sliding TTL
+    and evicting the least recently used ones once the memory budget is exceeded."""
+
+    def __init__(self, ttl_seconds, max_bytes):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, query_type, results, summary):
+        handle = uuid.uuid4().hex
+        entry = {
+            "query_type": query_type,
+            "results": results,
+            "ai_summary": summary,
+            "columns": list(results[0].DISPLAY_FIELDS) if results else [],
+            "facets": compute_facets(results),
+            "size": records_size(results),
+            "expires_at": time.monotonic() + self.ttl_seconds,
+        }
+        with self._lock:
+            self._purge_expired()
+            self._entries[handle] = entry
+            self._bytes += entry["size"]
+            # Always keep the newest entry, even if it alone exceeds the budget
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted["size"]
+        return handle
+
+    def get(self, handle):
+        with self._lock:
+            self._purge_expired()
+            entry = self._entries.get(handle)
+            if entry is None:
+                return None
+            entry["expires_at"] = time.monotonic() + self.ttl_seconds
+            self._entries.move_to_end(handle)
+            return entry
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        expired = [h for h, e in self._entries.items() if e["expires_at"] <= now]
+        for handle in expired:
+            self._bytes -= self._entries.pop(handle)["size"]
+
+result_store = ResultStore(RESULT_TTL_SECONDS, RESULT_STORE_MAX_BYTES)
+
+CONNECTION_BUCKETS = ((0, "0-99"), (100, "100-299"), (300, "300-499"), (500, "500+"))
+
+def connections_bucket(connections):
+    label = MISSING
+    if connections is not None:
+        for lower, name in CONNECTION_BUCKETS:
+            if connections >= lower:
+                label = name
+    return label
+
+def facet_value(record, field):
+    value = getattr(record, record.DISPLAY_FIELDS[field])
+    # Raw connection counts would give one facet per row, so they are grouped into ranges
+    if field == "Connections":
+        return connections_bucket(value)
+    # "USA", "US" and "United States" share one bucket; unrecognized locations keep their raw text
+    if field == "Location" and record.country_code:
+        return record.country_code
+    return MISSING if value is None else str(value)
+
+def facet_label(field, value):
+    if field == "Location" and value != MISSING and len(value) == 2 and value.isupper():
+        return country_name(value)
+    return value
+
+def compute_facets(results):
+    facets = {}
+    for field in FACET_FIELDS:
+        counts = {}
+        for r in results:
+            if field in r.DISPLAY_FIELDS:
+                value = facet_value(r, field)
+                counts[value] = counts.get(value, 0) + 1
+        if counts:
+            facets[field] = [
+                {"value": v, "label": facet_label(field, v), "count": n}
+                for v, n in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+            ]
+    return facets
+
+def sort_value(record, field):
+    value = getattr(record, record.SORT_FIELDS[field])
+    return value.lower() if isinstance(value, str) else value
+
+def encode_cursor(offset):
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset}).encode()).decode()
+
+def decode_cursor(cursor):
+    if not cursor:
+        return 0
+    try:
+        offset = int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["offset"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return offset
+
 # ------------------------
 # FastAPI Endpoint
 # ------------------------
@@ -157,10 +493,193 @@ def sourcing(query: QueryRequest):
     if refinement_query:
         combined_query += " AND " + refinement_query
 
-    filters = parse_query_with_llm(combined_query)
+    timings = {}
+    started = time.perf_counter()
+    filters, filters_hit = cached_parse(combined_query)
     query_type = filters.get("type")
+    timings["parse_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    started = time.perf_counter()
+    results, dsl_key, upstream_hit = cached_fetch(filters)
+    timings["fetch_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    started = time.perf_counter()
+    summary, summary_hit = cached_summary(results, combined_query, query_type, dsl_key)
+    timings["summary_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    # Only the masked query and allow-listed, masked filters are logged; nothing identifies the caller.
+    # Unmasked entries keep the exact cache key, which lets prewarm() refresh every stage for them.
+    logged_query = normalize_query(combined_query)
+    logged_filters = mask_filters(filters)
+    masked = logged_query != canonical_query(combined_query) or logged_filters != {k: filters[k] for k in logged_filters}
+    query_log.append(
+        query=logged_query,
+        masked=masked,
+        query_type=query_type,
+        filters=logged_filters,
+        dsl_hash=dsl_key,
+        results=len(results),
+        cache={"filters": filters_hit, "upstream": upstream_hit, "summary": summary_hit},
+        timings=timings,
+    )
+
+    handle = result_store.put(query_type, results, summary)
+
+    return {"query_type": query_type, "handle": handle, "total": len(results), "ai_summary": summary}
+
+def select_rows(entry, sort_by, descending, selected_filters):
+    rows = entry["results"]
+    for field, selected in selected_filters.items():
+        if selected:
+            wanted = set(selected)
+            rows = [r for r in rows if field in r.DISPLAY_FIELDS and facet_value(r, field) in wanted]
+
+    if not sort_by:
+        sort_by = "Connections" if entry["query_type"] == "employee" else "Size"
+    if rows and sort_by in rows[0].SORT_FIELDS:
+        keyed = [(sort_value(r, sort_by), r) for r in rows]
+        # Rows without a usable value always go last, whatever the direction
+        present = sorted((k for k in keyed if k[0] is not None), key=lambda k: k[0], reverse=descending)
+        rows = [r for _, r in present] + [r for v, r in keyed if v is None]
+    return rows
+
+def get_entry(handle):
+    entry = result_store.get(handle)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Result set not found or expired")
+    return entry
+
+@app.get("/results/{handle}")
+def get_results(
+    handle: str,
+    cursor: str = "",
+    limit: int = Query(25, ge=1, le=MAX_PAGE_SIZE),
+    sort_by: str = "",
+    descending: bool = True,
+    include_facets: bool = False,
+    location: list[str] = Query(default=[]),
+    size: list[str] = Query(default=[]),
+    connections: list[str] = Query(default=[]),
+):
+    entry = get_entry(handle)
+    rows = select_rows(entry, sort_by, descending, {"Location": location, "Size": size, "Connections": connections})
+
+    offset = decode_cursor(cursor)
+    page = rows[offset:offset + limit]
+    next_offset = offset + len(page)
+
+    response = {
+        "handle": handle,
+        "query_type": entry["query_type"],
+        "total": len(rows),
+        "offset": offset,
+        "columns": entry["columns"],
+        # Legacy display rows for rendering, plus the typed records for numeric logic
+        "rows": [r.to_display() for r in page],
+        "records": [r.to_dict() for r in page],
+        "next_cursor": encode_cursor(next_offset) if next_offset < len(rows) else None,
+    }
+    if include_facets:
+        response["facets"] = entry["facets"]
+    return response
+
+# ------------------------
+# Exports of a whole filtered result set
+# ------------------------
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+EXPORT_CHUNK_ROWS = 500
+
+def iter_csv(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for i, r in enumerate(rows, 1):
+        writer.writerow(r.to_display().values())
+        if i % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def build_xlsx(columns, rows):
+    buffer = io.BytesIO()
+    workbook = xlsxwriter.Workbook(buffer, {"in_memory": True, "constant_memory": True})
+    sheet = workbook.add_worksheet("Results")
+    sheet.write_row(0, 0, columns)
+    for i, r in enumerate(rows, 1):
+        sheet.write_row(i, 0, list(r.to_display().values()))
+    workbook.close()
+    return buffer.getvalue()
+
+def build_pdf(columns, rows):
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    elements = [Paragraph("AI Sourcing Results", styles['Title'])]
+    table = Table([columns] + [list(r.to_display().values()) for r in rows])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#2b7a0b")),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ]))
+    elements.append(table)
+    doc.build(elements)
+    return buffer.getvalue()
+
+@app.get("/results/{handle}/export")
+def export_results(
+    handle: str,
+    format: str = Query("csv", pattern="^(csv|xlsx|pdf)$"),
+    sort_by: str = "",
+    descending: bool = True,
+    location: list[str] = Query(default=[]),
+    size: list[str] = Query(default=[]),
+    connections: list[str] = Query(default=[]),
+):
+    entry = get_entry(handle)
+    rows = select_rows(entry, sort_by, descending, {"Location": location, "Size": size, "Connections": connections})
+    headers = {"Content-Disposition": f'attachment; filename="{entry["query_type"]}_results.{format}"'}
+    media_type = EXPORT_MEDIA_TYPES[format]
+
+    if format == "csv":
+        return StreamingResponse(iter_csv(entry["columns"], rows), media_type=media_type, headers=headers)
+    content = build_xlsx(entry["columns"], rows) if format == "xlsx" else build_pdf(entry["columns"], rows)
+    return Response(content=content, media_type=media_type, headers=headers)
+
+LOCAL_HOSTS = ("127.0.0.1", "::1", "localhost")
 
-    results = fetch_companies(filters) if query_type == "company" else fetch_employees(filters)
-    summary = summarize_results(results, combined_query, query_type)
+@app.post("/prewarm")
+def trigger_prewarm(
+    request: Request,
+    top_n: int = Query(PREWARM_TOP_N, ge=1),
+    rate: float = Query(PREWARM_RATE, gt=0),
+    max_calls: int = Query(PREWARM_MAX_CALLS, ge=1),
+    x_prewarm_token: str = Header(default=""),
+):
+    # Prewarming spends Groq/Coresignal quota, so callers are authenticated and limits capped server-side
+    if PREWARM_TOKEN:
+        if not hmac.compare_digest(x_prewarm_token, PREWARM_TOKEN):
+            raise HTTPException(status_code=403, detail="Invalid prewarm token")
+    elif request.client is None or request.client.host not in LOCAL_HOSTS:
+        raise HTTPException(status_code=403, detail="Prewarm is only allowed from localhost")
+    top_n, rate, max_calls = min(top_n, PREWARM_TOP_N), min(rate, PREWARM_RATE), min(max_calls, PREWARM_MAX_CALLS)
+    if not start_prewarm(top_n, rate, max_calls):
+        raise HTTPException(status_code=409, detail="Prewarm already running")
+    return {"status": "started", "top_n": top_n, "rate": rate, "max_calls": max_calls}
 
-    return {"query_type": query_type, "results": results, "ai_summary": summary}
+@app.get("/cache/stats")
+def cache_stats():
+    return {
+        "filters": filters_cache.stats(),
+        "upstream": upstream_cache.stats(),
+        "summary": summary_cache.stats(),
+        "last_prewarm": last_prewarm or None,
+    }
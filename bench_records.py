@@ -0,0 +1,85 @@
+import re
+import random
+import timeit
+from records import EmployeeRecord, CompanyRecord
+
+# ------------------------
+# Synthetic Coresignal rows
+# ------------------------
+SIZES = ["1-10 employees", "11-50 employees", "51-200 employees", "201-500 employees",
+         "501-1,000 employees", "1,001-5,000 employees", "10,001+ employees", None]
+COUNTRIES = ["India", "United States", "Germany", "United Kingdom", "Brazil", None]
+
+def make_rows(n, seed=0):
+    rnd = random.Random(seed)
+    employees = [{
+        "full_name": f"Person {i}",
+        "job_title": "Data Scientist",
+        "company_name": "Acme",
+        "location_country": rnd.choice(COUNTRIES),
+        "connections_count": rnd.choice([rnd.randint(0, 500), "500+", None]),
+    } for i in range(n)]
+    companies = [{
+        "name": f"Company {i}",
+        "industry": "Software",
+        "size_range": rnd.choice(SIZES),
+        "location_hq_country": rnd.choice(COUNTRIES),
+        "websites_main": f"company{i}.com",
+    } for i in range(n)]
+    return employees, companies
+
+# ------------------------
+# Legacy path: "N/A" strings, re-parsed by every consumer on every render
+# ------------------------
+def legacy_rows(employees, companies):
+    emp = [{"Name": e.get("full_name", "N/A"), "Location": e.get("location_country", "N/A"),
+            "Connections": e.get("connections_count", "N/A")} for e in employees]
+    com = [{"Name": c.get("name", "N/A"), "Size": c.get("size_range", "N/A"),
+            "Location": c.get("location_hq_country", "N/A")} for c in companies]
+    return emp, com
+
+def legacy_render(emp, com):
+    # Mirrors the old client: regex sort key for Size, digit filtering for highlight,
+    # and a Connections sort that has to guard against mixed str/int values
+    sorted(com, key=lambda r: int(m.group()) if (m := re.search(r"(\d+)", str(r["Size"]))) else 0, reverse=True)
+    for r in com:
+        digits = "".join(filter(str.isdigit, str(r["Size"])))
+        _ = int(digits) >= 500 if digits else False
+    sorted(emp, key=lambda r: r["Connections"] if isinstance(r["Connections"], int) else -1, reverse=True)
+
+# ------------------------
+# Typed path: parse once, consumers read numeric attributes
+# ------------------------
+def typed_rows(employees, companies):
+    return ([EmployeeRecord.from_coresignal(e) for e in employees],
+            [CompanyRecord.from_coresignal(c) for c in companies])
+
+def typed_render(emp, com):
+    sorted((r for r in com if r.size_min is not None), key=lambda r: r.size_min, reverse=True)
+    for r in com:
+        _ = (r.size_max or r.size_min or 0) >= 500
+    sorted((r for r in emp if r.connections is not None), key=lambda r: r.connections, reverse=True)
+
+def bench(n=1000, renders=10, repeat=5):
+    employees, companies = make_rows(n)
+    legacy = legacy_rows(employees, companies)
+    typed = typed_rows(employees, companies)
+
+    def best(fn):
+        return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+    results = {
+        "legacy map": best(lambda: legacy_rows(employees, companies)),
+        "typed parse": best(lambda: typed_rows(employees, companies)),
+        "legacy render": best(lambda: legacy_render(*legacy)),
+        "typed render": best(lambda: typed_render(*typed)),
+    }
+    print(f"{n} employee rows + {n} company rows, best of {repeat}")
+    for name, seconds in results.items():
+        print(f"  {name:<14} {seconds * 1000:8.2f} ms  ({seconds / (2 * n) * 1e6:6.2f} us/row)")
+    legacy_total = results["legacy map"] + renders * results["legacy render"]
+    typed_total = results["typed parse"] + renders * results["typed render"]
+    print(f"  over {renders} renders: legacy {legacy_total * 1000:.2f} ms, typed {typed_total * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    bench()
@@ -1,11 +1,7 @@
 import streamlit as st
 import pandas as pd
-import requests
-from io import BytesIO
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
+import json
+from transport import get_transport, TransportError
 
 # ------------------------
 # Page config
@@ -48,78 +44,134 @@ with st.container():
     search_button = st.button("Search")
 
 # Initialize session state
-if 'filtered_df' not in st.session_state:
-    st.session_state.filtered_df = None
 if 'data' not in st.session_state:
     st.session_state.data = None
+if 'cursors' not in st.session_state:
+    st.session_state.cursors = [""]
+if 'filter_signature' not in st.session_state:
+    st.session_state.filter_signature = None
+if 'facets' not in st.session_state:
+    st.session_state.facets = {}
+if 'columns' not in st.session_state:
+    st.session_state.columns = []
+if 'export' not in st.session_state:
+    st.session_state.export = None
+
+PAGE_SIZES = [25, 50, 100]
+PAGE_TIMEOUT = 10
+EXPORT_TIMEOUT = 120
+EXPORT_FORMATS = {
+    "csv": ("📥 CSV", "text/csv"),
+    "xlsx": ("📊 Excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "pdf": ("📄 PDF", "application/pdf"),
+}
+transport = get_transport()
+
+def query_pairs(params):
+    # Repeated query parameters are sent as (key, value) pairs
+    return [(k, str(v)) for k, values in params.items() for v in (values if isinstance(values, list) else [values])]
+
+def fetch_page(params):
+    # Result sets live in the memory of the replica that ran the search, so page requests stick to it
+    data = st.session_state['data']
+    return transport.get(f"/results/{data['handle']}", params=query_pairs(params), timeout=PAGE_TIMEOUT, backend=data['backend'])
+
+def prepare_export(params, file_format, signature):
+    # Exports are built by the backend that holds the result set and relayed here, so it stays private
+    data = st.session_state['data']
+    try:
+        response = transport.get(f"/results/{data['handle']}/export", params=query_pairs({**params, "format": file_format}),
+                                 timeout=EXPORT_TIMEOUT, backend=data['backend'])
+    except TransportError as e:
+        st.session_state['export'] = {"error": f"❌ Could not reach FastAPI: {e}"}
+        return
+    if response.status_code != 200:
+        st.session_state['export'] = {"error": "❌ Error exporting results from FastAPI."}
+        return
+    st.session_state['export'] = {"format": file_format, "signature": signature, "data": response.content}
+
+def clear_export():
+    st.session_state['export'] = None
+
+def next_page(cursor):
+    st.session_state.cursors.append(cursor)
+
+def previous_page():
+    if len(st.session_state.cursors) > 1:
+        st.session_state.cursors.pop()
 
 # ------------------------
 # Fetch Data
 # ------------------------
 if search_button:
-    st.info("Fetching data from FastAPI...")
-    response = requests.post("http://127.0.0.1:8000/sourcing", json={
-        "user_query": user_query,
-        "refinement_query": refinement_query
-    })
-
-    if response.status_code == 200:
-        st.session_state['data'] = response.json()
-        df = pd.DataFrame(st.session_state['data']['results'])
-        st.session_state['filtered_df'] = df.copy()
-        if df.empty:
-            st.warning("No results found.")
-        else:
-            st.success(f"📊 Found {len(df)} {st.session_state['data']['query_type']}(s)")
+    status = st.empty()
+    # Redrawing the status while waiting lets Streamlit interrupt this run when a new search starts,
+    # which cancels the in-flight request instead of leaving it to block the session
+    try:
+        response = transport.post("/sourcing", json={
+            "user_query": user_query,
+            "refinement_query": refinement_query
+        }, on_tick=lambda elapsed: status.info(f"Fetching data from FastAPI... ({elapsed:.0f}s)"))
+    except TransportError as e:
+        status.error(f"❌ Could not reach FastAPI: {e}")
     else:
-        st.error("❌ Error fetching data from FastAPI.")
+        status.empty()
+        if response.status_code == 200:
+            st.session_state['data'] = {**response.json(), "backend": response.backend}
+            st.session_state['cursors'] = [""]
+            st.session_state['filter_signature'] = None
+            st.session_state['facets'] = {}
+            st.session_state['export'] = None
+            if st.session_state['data']['total'] == 0:
+                st.warning("No results found.")
+            else:
+                # Facets only depend on the stored result set, so they are fetched once per search
+                try:
+                    facets_response = fetch_page({"limit": 1, "include_facets": "true"})
+                    if facets_response.status_code == 200:
+                        st.session_state['facets'] = facets_response.json()["facets"]
+                        st.session_state['columns'] = facets_response.json()["columns"]
+                except TransportError:
+                    st.warning("⚠️ Could not load filter options.")
+                st.success(f"📊 Found {st.session_state['data']['total']} {st.session_state['data']['query_type']}(s)")
+        else:
+            st.error("❌ Error fetching data from FastAPI.")
 
 # ------------------------
 # Filters & Results
 # ------------------------
-if st.session_state['filtered_df'] is not None:
-    df = st.session_state['filtered_df']
+if st.session_state['data'] is not None and st.session_state['data']['total'] > 0:
+    facets = st.session_state['facets']
 
     st.subheader("🔎 Filters")
     filters_col, results_col = st.columns([1, 3])
 
     with filters_col:
-        filtered_df = df.copy()
-
-        # Location Filter
-        if "Location" in df.columns:
-            unique_locations = df["Location"].dropna().unique().tolist()
-            selected_locations = st.multiselect(
-                "Filter by Location",
-                options=["Select All"] + unique_locations,
-                default=["Select All"]
-            )
-            if "Select All" not in selected_locations:
-                filtered_df = filtered_df[filtered_df["Location"].isin(selected_locations)]
-
-        # Size Filter
-        if "Size" in df.columns:
-            unique_sizes = df["Size"].dropna().unique().tolist()
-            selected_sizes = st.multiselect(
-                "Filter by Size",
-                options=["Select All"] + unique_sizes,
-                default=["Select All"]
-            )
-            if "Select All" not in selected_sizes:
-                filtered_df = filtered_df[filtered_df["Size"].isin(selected_sizes)]
-
-        # Connections Filter
-        if "Connections" in df.columns:
-            unique_connections = sorted(df["Connections"].dropna().unique().tolist())
-            selected_connections = st.multiselect(
-                "Filter by Connections",
-                options=["Select All"] + unique_connections,
-                default=["Select All"]
+        params = {}
+        for field in ("Location", "Size", "Connections"):
+            if field not in facets:
+                continue
+            options = [f["value"] for f in facets[field]]
+            labels = {f["value"]: f"{f['label']} ({f['count']})" for f in facets[field]}
+            selected = st.multiselect(
+                f"Filter by {field}",
+                options=["Select All"] + options,
+                default=["Select All"],
+                format_func=lambda v, labels=labels: labels.get(v, v)
             )
-            if "Select All" not in selected_connections:
-                filtered_df = filtered_df[filtered_df["Connections"].isin(selected_connections)]
+            if "Select All" not in selected:
+                params[field.lower()] = selected
 
-        st.session_state['filtered_df'] = filtered_df
+        page_size = st.selectbox("Results per page", PAGE_SIZES)
+
+        # Any change of filters or page size starts over from the first page
+        signature = json.dumps([params, page_size], sort_keys=True)
+        if signature != st.session_state['filter_signature']:
+            st.session_state['filter_signature'] = signature
+            st.session_state['cursors'] = [""]
+
+        # A cleared multiselect matches nothing; sending it would mean "no filter" to the backend
+        no_matches = any(selected == [] for selected in params.values())
 
     # ------------------------
     # Results Display with Multi-level Highlight
@@ -127,18 +179,33 @@ if st.session_state['filtered_df'] is not None:
     with results_col:
         st.subheader("📋 Filtered Results (Multi-level Highlight)")
 
-        display_df = filtered_df.copy()
+        if no_matches:
+            page = {"total": 0, "offset": 0, "columns": st.session_state['columns'], "rows": [], "records": [], "next_cursor": None}
+        else:
+            try:
+                page_response = fetch_page({**params, "limit": page_size, "cursor": st.session_state['cursors'][-1]})
+            except TransportError as e:
+                st.error(f"❌ Could not reach FastAPI: {e}")
+                st.stop()
+            if page_response.status_code == 404:
+                st.warning("⌛ These results have expired on the server. Please search again.")
+                st.session_state['data'] = None
+                st.stop()
+            elif page_response.status_code != 200:
+                st.error("❌ Error fetching results page from FastAPI.")
+                st.stop()
+            page = page_response.json()
+
+        # Rows arrive already filtered and sorted; index by global rank so highlighting survives paging
+        display_df = pd.DataFrame(page["rows"], columns=page["columns"])
+        display_df.index = range(page["offset"], page["offset"] + len(display_df))
         top_n_highlight = 5
-        if st.session_state['data']['query_type'] == "employee" and "Connections" in display_df.columns:
-            display_df = display_df.sort_values(by="Connections", ascending=False).reset_index(drop=True)
-        elif st.session_state['data']['query_type'] == "company" and "Size" in display_df.columns:
-            display_df["Size_numeric"] = display_df["Size"].str.extract("(\d+)").astype(float).fillna(0)
-            display_df = display_df.sort_values(by="Size_numeric", ascending=False).reset_index(drop=True)
-            display_df.drop("Size_numeric", axis=1, inplace=True)
 
         # Multi-level highlight
         def combined_highlight(row):
             styles = [''] * len(row)
+            # Typed values parsed once on the server, aligned with the display rows
+            record = page["records"][row.name - page["offset"]]
             query_skills = user_query.lower().split()
 
             for i, col in enumerate(row.index):
@@ -155,72 +222,47 @@ if st.session_state['filtered_df'] is not None:
                     elif len(matched_skills) == 1:
                         styles[i] = 'color: #ff7f0e; font-weight: bold'
                 # Seniority / Connections / Company Size → Blue
-                if st.session_state['data']['query_type'] == "employee" and col == "Connections" and row[col] >= 300:
-                    styles[i] = 'color: #1f77b4; font-weight: bold'
+                if st.session_state['data']['query_type'] == "employee" and col == "Connections":
+                    if (record["connections"] or 0) >= 300:
+                        styles[i] = 'color: #1f77b4; font-weight: bold'
                 if st.session_state['data']['query_type'] == "company" and col == "Size":
-                    try:
-                        size_num = int(''.join(filter(str.isdigit, str(row[col]))))
-                        if size_num >= 500:
-                            styles[i] = 'color: #1f77b4; font-weight: bold'
-                    except:
-                        pass
+                    # Open-ended buckets such as "10,001+" only have a lower bound
+                    if (record["size_max"] or record["size_min"] or 0) >= 500:
+                        styles[i] = 'color: #1f77b4; font-weight: bold'
             return styles
 
         st.dataframe(display_df.style.apply(combined_highlight, axis=1), use_container_width=True)
 
+        prev_col, info_col, next_col = st.columns([1, 3, 1])
+        with prev_col:
+            st.button("◀ Previous", on_click=previous_page, disabled=len(st.session_state['cursors']) == 1)
+        with info_col:
+            if page["total"]:
+                st.caption(f"Showing {page['offset'] + 1}–{page['offset'] + len(display_df)} of {page['total']}")
+            else:
+                st.caption("No results match the selected filters.")
+        with next_col:
+            st.button("Next ▶", on_click=next_page, args=(page["next_cursor"],), disabled=page["next_cursor"] is None)
+
         # ------------------------
         # Export Options
         # ------------------------
         st.subheader("📂 Export Options")
-        csv_col, excel_col, pdf_col = st.columns(3)
-
-        # CSV Export
-        csv = display_df.to_csv(index=False).encode('utf-8')
-        with csv_col:
-            st.download_button(
-                "📥 CSV",
-                data=csv,
-                file_name=f"{st.session_state['data']['query_type']}_results.csv",
-                mime="text/csv"
-            )
-
-        # Excel Export
-        excel_buffer = BytesIO()
-        with pd.ExcelWriter(excel_buffer, engine="xlsxwriter") as writer:
-            display_df.to_excel(writer, index=False, sheet_name="Results")
-        with excel_col:
-            st.download_button(
-                "📊 Excel",
-                data=excel_buffer.getvalue(),
-                file_name=f"{st.session_state['data']['query_type']}_results.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-
-        # PDF Export
-        pdf_buffer = BytesIO()
-        doc = SimpleDocTemplate(pdf_buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
-        elements = [Paragraph("AI Sourcing Results", styles['Title'])]
-        table_data = [display_df.columns.tolist()] + display_df.values.tolist()
-        table = Table(table_data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#2b7a0b")),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ]))
-        elements.append(table)
-        doc.build(elements)
-        with pdf_col:
-            st.download_button(
-                "📄 PDF",
-                data=pdf_buffer.getvalue(),
-                file_name=f"{st.session_state['data']['query_type']}_results.pdf",
-                mime="application/pdf"
-            )
+        if page["total"]:
+            # Exports cover the whole filtered result set; each is built on request, then offered for download
+            export = st.session_state['export']
+            if export and "error" in export:
+                st.error(export["error"])
+            for column, (file_format, (label, mime)) in zip(st.columns(len(EXPORT_FORMATS)), EXPORT_FORMATS.items()):
+                with column:
+                    if export and export.get("format") == file_format and export.get("signature") == signature:
+                        st.download_button(f"{label} ⬇", data=export["data"], file_name=f"results.{file_format}",
+                                           mime=mime, on_click=clear_export)
+                    else:
+                        st.button(label, key=f"export_{file_format}", on_click=prepare_export,
+                                  args=(params, file_format, signature))
+        else:
+            st.caption("Nothing to export for the selected filters.")
 
         # ------------------------
         # AI Summary (plain text)
@@ -0,0 +1,59 @@
+import os
+import json
+import argparse
+import requests
+from query_log import read_entries, top_recurring, is_masked, simulate_hit_rates, QUERY_LOG_PATH
+
+# ------------------------
+# Prewarm command
+# ------------------------
+# Caches live in each backend process, so prewarming is triggered over HTTP on every replica.
+# Schedule it off-peak, e.g. from cron:  0 6 * * 1-5  python prewarm.py --top 20 --rate 0.5
+DEFAULT_URLS = os.getenv("SOURCING_API_URLS", "http://127.0.0.1:8000")
+PREWARM_TOKEN = os.getenv("PREWARM_TOKEN", "")
+
+REPORT_TOP_N = 20
+
+def report(log_path, top_n, window):
+    top_n = top_n or REPORT_TOP_N
+    entries = read_entries(log_path)
+    print(f"{len(entries)} logged searches in {log_path}")
+    print(f"Top {top_n} recurring queries:")
+    for entry in top_recurring(entries, "query", top_n):
+        note = " (masked, not prewarmed)" if is_masked(entry) else ""
+        print(f"  {entry['query']!r} -> {entry.get('query_type')} {entry.get('dsl_hash')}{note}")
+    print(f"Simulated hit rate for the first {window} searches of each day:")
+    print(json.dumps(simulate_hit_rates(entries, top_n, window), indent=2))
+
+def trigger(urls, top_n, rate, max_calls):
+    # Unset limits are left to each backend's own PREWARM_* defaults
+    params = {name: value for name, value in {"top_n": top_n, "rate": rate, "max_calls": max_calls}.items()
+              if value is not None}
+    for url in urls:
+        try:
+            response = requests.post(f"{url.rstrip('/')}/prewarm", params=params,
+                                     headers={"X-Prewarm-Token": PREWARM_TOKEN}, timeout=10)
+        except requests.RequestException as e:
+            print(f"{url}: ❌ {e}")
+            continue
+        print(f"{url}: {response.status_code} {response.json()}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Prewarm the sourcing caches from the query log.")
+    parser.add_argument("--top", type=int, help="number of recurring queries and DSL payloads to refresh (capped by PREWARM_TOP_N)")
+    parser.add_argument("--rate", type=float, help="maximum LLM/upstream calls per second (capped by PREWARM_RATE)")
+    parser.add_argument("--max-calls", type=int, help="total LLM/upstream call budget per replica (capped by PREWARM_MAX_CALLS)")
+    parser.add_argument("--url", action="append", help="backend base URL (repeatable; defaults to SOURCING_API_URLS)")
+    parser.add_argument("--report", action="store_true", help="only print the hit-rate report from the local log")
+    parser.add_argument("--log", default=QUERY_LOG_PATH, help="query log path for --report")
+    parser.add_argument("--window", type=int, default=50, help="searches per day counted as 'startup' in --report")
+    args = parser.parse_args()
+
+    if args.report:
+        report(args.log, args.top, args.window)
+    else:
+        urls = args.url or [url.strip() for url in DEFAULT_URLS.split(",") if url.strip()]
+        trigger(urls, args.top, args.rate, args.max_calls)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import os
+import re
+import glob
+import json
+import time
+import hashlib
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+# ------------------------
+# Query log configuration
+# ------------------------
+QUERY_LOG_PATH = os.getenv("QUERY_LOG_PATH", "logs/query_log.jsonl")
+QUERY_LOG_MAX_BYTES = int(os.getenv("QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+QUERY_LOG_BACKUPS = int(os.getenv("QUERY_LOG_BACKUPS", "5"))
+QUERY_LOG_RETENTION_DAYS = int(os.getenv("QUERY_LOG_RETENTION_DAYS", "30"))
+
+URL_RE = re.compile(r"https?://\S+|www\.\S+")
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+# International numbers with a leading "+", North American style 555-123-4567 / (555) 123 4567, national
+# numbers with a trunk 0 such as 020 7946 0958 / 07700 900123, or 10+ bare digits; years, counts and
+# ranges such as "2015-2020" or "50-200" are left alone
+PHONE_RE = re.compile(
+    r"(?<![\w+])(?:\+\d[\d\s().-]{6,}\d|\(?\d{3}\)?[\s.-]?\d{3}[\s.-]\d{4}|0\d{2,4}[\s.-]\d{3,4}[\s.-]?\d{3,4}|\d{10,})(?!\d)"
+)
+# Parsed filter keys worth keeping in the log; anything else the LLM returns is dropped
+LOGGED_FILTER_KEYS = ("type", "company", "industry", "location", "skills", "keywords", "min_employees")
+
+# ------------------------
+# Anonymization & hashing
+# ------------------------
+def canonical_query(query):
+    """Lowercases and collapses whitespace; used as the cache key, never written to the log."""
+    return " ".join(query.lower().split())
+
+def mask_text(text):
+    """Replaces URLs, emails and phone numbers with placeholders."""
+    text = URL_RE.sub("<url>", text)
+    text = EMAIL_RE.sub("<email>", text)
+    return PHONE_RE.sub("<phone>", text)
+
+def normalize_query(query):
+    """Canonical form with URLs, emails and phone numbers masked, for the log only."""
+    return canonical_query(mask_text(query))
+
+def mask_filters(filters):
+    """Keeps the allow-listed filter keys, with string values (and strings in lists) masked."""
+    def mask(value):
+        if isinstance(value, str):
+            return mask_text(value)
+        if isinstance(value, list):
+            return [mask(v) for v in value]
+        return value
+    return {key: mask(filters[key]) for key in LOGGED_FILTER_KEYS if key in filters}
+
+def dsl_hash(query_type, payload):
+    canonical = json.dumps({"type": query_type, "dsl": payload}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+# ------------------------
+# Writing & reading the log
+# ------------------------
+def process_log_path(path):
+    # RotatingFileHandler is not safe with several writers, so each process gets its own file
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{os.getpid()}{ext}"
+
+def log_files(path):
+    stem, ext = os.path.splitext(path)
+    return sorted(set(glob.glob(f"{stem}.*{ext}*")) | set(glob.glob(f"{path}*")))
+
+def prune_logs(path, retention_days=QUERY_LOG_RETENTION_DAYS):
+    """Deletes log files, e.g. those of exited processes, not written to within the retention period."""
+    cutoff = time.time() - retention_days * 86400
+    for file in log_files(path):
+        if os.path.getmtime(file) < cutoff:
+            os.remove(file)
+
+class QueryLog:
+    """Appends one JSON object per search to this process's size-rotated JSONL file."""
+
+    def __init__(self, path, max_bytes, backups):
+        self.path = process_log_path(path) if path else path
+        self._logger = logging.getLogger(f"sourcing.query_log.{self.path}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        if path and not self._logger.handlers:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            prune_logs(path)
+            handler = RotatingFileHandler(self.path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._logger.addHandler(handler)
+
+    def append(self, **fields):
+        if not self.path:
+            return
+        record = {"ts": datetime.now(timezone.utc).isoformat(timespec="seconds"), **fields}
+        self._logger.info(json.dumps(record, default=str))
+
+def read_entries(path):
+    """Returns the entries of every process's log and its rotated backups, oldest first.
+
+    Malformed lines are skipped."""
+    entries = []
+    for file in log_files(path):
+        with open(file, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    entries.sort(key=lambda e: e.get("ts", ""))
+    return entries
+
+def top_recurring(entries, key, n, min_count=2):
+    """Returns the most recent entry for each of the n most frequent values of key seen at least min_count times."""
+    counts = Counter()
+    latest = {}
+    for entry in entries:
+        value = entry.get(key)
+        if value:
+            counts[value] += 1
+            latest[value] = entry
+    return [latest[value] for value, count in counts.most_common(n) if count >= min_count]
+
+# ------------------------
+# Prewarm budget & hit-rate simulation
+# ------------------------
+class RateBudget:
+    """Paces upstream calls to at most `rate` per second and `max_calls` in total."""
+
+    def __init__(self, rate, max_calls):
+        self.interval = 1 / rate if rate > 0 else 0
+        self.max_calls = max_calls
+        self.used = 0
+        self._next_at = time.monotonic()
+
+    def acquire(self):
+        if self.used >= self.max_calls:
+            return False
+        delay = self._next_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._next_at = max(self._next_at, time.monotonic()) + self.interval
+        self.used += 1
+        return True
+
+def is_masked(entry):
+    # Entries written before the flag existed are treated as masked
+    return entry.get("masked", True)
+
+def prewarm_candidates(entries, top_n):
+    """The most recent unmasked entry of each of the top-N recurring queries and DSL payloads.
+
+    Masked entries are skipped: their text is not what users typed, so the filters and summaries
+    derived from it would be stored under keys live traffic never uses."""
+    return [e for e in top_recurring(entries, "query", top_n) + top_recurring(entries, "dsl_hash", top_n)
+            if not is_masked(e) and e.get("query_type") in ("company", "employee")]
+
+def simulate_hit_rates(entries, top_n, window=50):
+    """Replays the first `window` searches of each logged day against a cold cache and against one
+    prewarmed, like prewarm(), with the filters, upstream responses and summaries of the top-N recurring
+    unmasked queries and DSL payloads of all earlier days. Masked searches never count as filter or
+    summary hits, since their real text is unknown."""
+    days = {}
+    for entry in entries:
+        days.setdefault(entry.get("ts", "")[:10], []).append(entry)
+
+    lookups = 0
+    hits = {"cold": Counter(), "prewarmed": Counter()}
+    history = []
+    for day in sorted(days):
+        if history:
+            top = prewarm_candidates(history, top_n)
+            warm = {
+                "filters": {e["query"] for e in top},
+                "upstream": {e["dsl_hash"] for e in top if e.get("dsl_hash")},
+                "summary": {(e.get("dsl_hash"), e["query"]) for e in top if e.get("dsl_hash")},
+            }
+            caches = {"cold": {stage: set() for stage in warm}, "prewarmed": warm}
+            for entry in days[day][:window]:
+                lookups += 1
+                keys = {"upstream": entry.get("dsl_hash")}
+                if not is_masked(entry):
+                    keys["filters"] = entry.get("query")
+                    keys["summary"] = (entry.get("dsl_hash"), entry.get("query"))
+                for name, cache in caches.items():
+                    for stage, key in keys.items():
+                        hits[name][stage] += key in cache[stage]
+                        cache[stage].add(key)
+        history.extend(days[day])
+
+    def rate(count):
+        return round(count / lookups, 3) if lookups else None
+
+    return {
+        "days": max(len(days) - 1, 0),
+        "lookups": lookups,
+        **{name: {stage: rate(counter[stage]) for stage in ("filters", "upstream", "summary")} for name, counter in hits.items()},
+    }
@@ -0,0 +1,149 @@
+import re
+import pycountry
+from functools import lru_cache
+from dataclasses import dataclass, asdict
+
+# ------------------------
+# Field parsing helpers
+# ------------------------
+MISSING = "N/A"
+NUMBER_RE = re.compile(r"\d[\d,]*")
+COUNT_RE = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*(?:([kKmM])(?![a-zA-Z]))?")
+COUNT_SUFFIXES = {"": 1, "k": 1_000, "m": 1_000_000}
+
+# Colloquial names that ISO 3166 (and so pycountry) does not list
+COUNTRY_ALIASES = {
+    "uk": "GB", "great britain": "GB", "england": "GB", "scotland": "GB", "wales": "GB",
+    "northern ireland": "GB", "russia": "RU", "turkey": "TR", "uae": "AE", "macedonia": "MK",
+    "ivory coast": "CI", "palestine": "PS", "kosovo": "XK",
+}
+
+def clean_text(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value if value and value != MISSING else None
+
+def parse_count(value):
+    """Parses Coresignal counts such as 500, "500", "500+", "1,234" or "1.5K" into an int."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    match = COUNT_RE.search(str(value)) if value is not None else None
+    if not match:
+        return None
+    number, suffix = match.groups()
+    return int(float(number.replace(",", "")) * COUNT_SUFFIXES[(suffix or "").lower()])
+
+def parse_size_range(value):
+    """Parses size buckets such as "51-200 employees" or "10,001+ employees" into (min, max)."""
+    if value is None:
+        return None, None
+    bounds = [int(n.replace(",", "")) for n in NUMBER_RE.findall(str(value))]
+    if not bounds:
+        return None, None
+    return bounds[0], bounds[1] if len(bounds) > 1 else None
+
+@lru_cache(maxsize=1024)
+def country_code(value):
+    """Normalizes a country name or ISO alpha-2/alpha-3 code to its ISO 3166 alpha-2 code."""
+    value = clean_text(value)
+    if value is None:
+        return None
+    key = value.lower().removeprefix("the ")
+    if key in COUNTRY_ALIASES:
+        return COUNTRY_ALIASES[key]
+    try:
+        return pycountry.countries.lookup(key).alpha_2
+    except LookupError:
+        return None
+
+@lru_cache(maxsize=1024)
+def country_name(code):
+    country = pycountry.countries.get(alpha_2=code)
+    return country.name if country else code
+
+# ------------------------
+# Typed result records
+# ------------------------
+@dataclass(slots=True)
+class EmployeeRecord:
+    name: str | None
+    title: str | None
+    company: str | None
+    location: str | None
+    country_code: str | None
+    connections: int | None
+
+    # Display column -> attribute used for filtering and sorting on that column
+    DISPLAY_FIELDS = {"Name": "name", "Title": "title", "Company": "company", "Location": "location", "Connections": "connections"}
+    SORT_FIELDS = DISPLAY_FIELDS
+
+    @classmethod
+    def from_coresignal(cls, e):
+        location = clean_text(e.get("location_country"))
+        return cls(
+            name=clean_text(e.get("full_name")),
+            title=clean_text(e.get("job_title")),
+            company=clean_text(e.get("company_name")),
+            location=location,
+            country_code=country_code(location),
+            connections=parse_count(e.get("connections_count")),
+        )
+
+    def to_display(self):
+        return {
+            "Name": self.name or MISSING,
+            "Title": self.title or MISSING,
+            "Company": self.company or MISSING,
+            "Location": self.location or MISSING,
+            "Connections": self.connections if self.connections is not None else MISSING,
+        }
+
+    def to_dict(self):
+        return asdict(self)
+
+@dataclass(slots=True)
+class CompanyRecord:
+    name: str | None
+    industry: str | None
+    size_label: str | None
+    size_min: int | None
+    size_max: int | None
+    location: str | None
+    country_code: str | None
+    website: str | None
+
+    DISPLAY_FIELDS = {"Name": "name", "Industry": "industry", "Size": "size_label", "Location": "location", "Website": "website"}
+    SORT_FIELDS = {**DISPLAY_FIELDS, "Size": "size_min"}
+
+    @classmethod
+    def from_coresignal(cls, c):
+        size_label = clean_text(c.get("size_range"))
+        size_min, size_max = parse_size_range(size_label)
+        location = clean_text(c.get("location_hq_country"))
+        return cls(
+            name=clean_text(c.get("name")),
+            industry=clean_text(c.get("industry")),
+            size_label=size_label,
+            size_min=size_min,
+            size_max=size_max,
+            location=location,
+            country_code=country_code(location),
+            website=clean_text(c.get("websites_main") or c.get("website_main") or c.get("website")),
+        )
+
+    def to_display(self):
+        return {
+            "Name": self.name or MISSING,
+            "Industry": self.industry or MISSING,
+            "Size": self.size_label or MISSING,
+            "Location": self.location or MISSING,
+            "Website": self.website or MISSING,
+        }
+
+    def to_dict(self):
+        return asdict(self)
@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# app.py builds its Groq client and query log at import time; keep both away from real credentials and files
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ["QUERY_LOG_PATH"] = os.path.join(tempfile.mkdtemp(prefix="query-log-"), "query_log.jsonl")
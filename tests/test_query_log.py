@@ -0,0 +1,103 @@
+import pytest
+from query_log import (
+    QueryLog, RateBudget, normalize_query, mask_filters, dsl_hash, read_entries, top_recurring, prewarm_candidates,
+    simulate_hit_rates,
+)
+
+# ------------------------
+# Anonymization
+# ------------------------
+@pytest.mark.parametrize("query, expected", [
+    ("Call  +44 20 7946 0958 now", "call <phone> now"),
+    ("call 020 7946 0958", "call <phone>"),
+    ("mobile 07700 900123", "mobile <phone>"),
+    ("ring (555) 123-4567", "ring <phone>"),
+    ("id 5551234567", "id <phone>"),
+    ("Mail Jane.Doe@example.com", "mail <email>"),
+    ("see https://example.com/jobs?id=1 today", "see <url> today"),
+])
+def test_normalize_query_masks_contact_details(query, expected):
+    assert normalize_query(query) == expected
+
+@pytest.mark.parametrize("query", [
+    "data scientists in India",
+    "founded 2015-2020",
+    "companies with 50-200 employees",
+    "more than 1000 employees since 2019",
+    "revenue 10 000 000",
+])
+def test_normalize_query_keeps_years_counts_and_ranges(query):
+    assert normalize_query(query) == query.lower()
+
+def test_mask_filters_allow_lists_keys_and_masks_strings():
+    filters = {
+        "type": "employee", "company": "jane@example.com", "skills": ["Python", "call 020 7946 0958"],
+        "min_employees": 50, "raw_text": "secret", "notes": "anything",
+    }
+    assert mask_filters(filters) == {
+        "type": "employee", "company": "<email>", "skills": ["Python", "call <phone>"], "min_employees": 50,
+    }
+
+def test_dsl_hash_is_stable_and_type_sensitive():
+    payload = {"query": {"match_all": {}}}
+    assert dsl_hash("company", payload) == dsl_hash("company", {"query": {"match_all": {}}})
+    assert dsl_hash("company", payload) != dsl_hash("employee", payload)
+
+# ------------------------
+# Reading & ranking
+# ------------------------
+def test_log_round_trip(tmp_path):
+    path = str(tmp_path / "query_log.jsonl")
+    log = QueryLog(path, max_bytes=1024 * 1024, backups=1)
+    log.append(query="b", masked=False)
+    log.append(query="a", masked=False)
+    (tmp_path / "query_log.1.jsonl").write_text('{"ts": "2000-01-01T00:00:00+00:00", "query": "old"}\nnot json\n')
+
+    assert [e["query"] for e in read_entries(path)] == ["old", "b", "a"]
+
+def test_top_recurring_keeps_latest_entry_of_frequent_values():
+    entries = [{"query": q, "n": i} for i, q in enumerate(["a", "b", "a", "c", "b", "a", None])]
+
+    assert [(e["query"], e["n"]) for e in top_recurring(entries, "query", 5)] == [("a", 5), ("b", 4)]
+    assert [e["query"] for e in top_recurring(entries, "query", 1)] == ["a"]
+    assert [e["query"] for e in top_recurring(entries, "query", 5, min_count=1)] == ["a", "b", "c"]
+
+def test_prewarm_candidates_skip_masked_and_unparsed_entries():
+    entries = [
+        {"query": "python devs", "query_type": "employee", "masked": False},
+        {"query": "call <phone>", "query_type": "employee", "masked": True},
+        {"query": "gibberish", "query_type": "unknown", "masked": False},
+        {"query": "legacy", "query_type": "company"},
+    ] * 2
+    assert [e["query"] for e in prewarm_candidates(entries, 10)] == ["python devs"]
+
+# ------------------------
+# Budget & simulation
+# ------------------------
+def test_rate_budget_caps_total_calls():
+    budget = RateBudget(rate=1000, max_calls=3)
+    assert [budget.acquire() for _ in range(5)] == [True, True, True, False, False]
+    assert budget.used == 3
+
+def entry(day, query, dsl, masked=False):
+    return {"ts": f"2026-01-{day:02d}T09:00:00+00:00", "query": query, "query_type": "company",
+            "dsl_hash": dsl, "masked": masked}
+
+def test_simulate_hit_rates_counts_every_stage():
+    history = [entry(1, "fintech", "d1"), entry(1, "fintech", "d1"), entry(1, "call <phone>", "d2", masked=True),
+               entry(1, "call <phone>", "d2", masked=True)]
+    today = [entry(2, "fintech", "d1"), entry(2, "call <phone>", "d2", masked=True), entry(2, "pharma", "d3")]
+
+    report = simulate_hit_rates(history + today, top_n=5)
+
+    assert report["days"] == 1 and report["lookups"] == 3
+    assert report["cold"] == {"filters": 0.0, "upstream": 0.0, "summary": 0.0}
+    # Only the unmasked recurring search is prewarmed, on all three stages
+    assert report["prewarmed"] == {"filters": 0.333, "upstream": 0.333, "summary": 0.333}
+
+def test_simulate_hit_rates_without_history():
+    assert simulate_hit_rates([entry(1, "fintech", "d1")], top_n=5) == {
+        "days": 0, "lookups": 0,
+        "cold": {"filters": None, "upstream": None, "summary": None},
+        "prewarmed": {"filters": None, "upstream": None, "summary": None},
+    }
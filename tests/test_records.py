@@ -0,0 +1,66 @@
+import pytest
+from records import EmployeeRecord, CompanyRecord, MISSING, parse_count, parse_size_range, country_code, country_name
+
+# ------------------------
+# Field parsing
+# ------------------------
+@pytest.mark.parametrize("value, expected", [
+    (500, 500), ("500", 500), ("500+", 500), ("1,234", 1234), ("1.5K", 1500), ("2k", 2000),
+    ("1.2M", 1_200_000), ("12 months", 12), (12.0, 12), ("N/A", None), ("", None), (None, None), (True, None),
+])
+def test_parse_count(value, expected):
+    assert parse_count(value) == expected
+
+@pytest.mark.parametrize("value, expected", [
+    ("51-200 employees", (51, 200)),
+    ("1,001-5,000 employees", (1001, 5000)),
+    ("10,001+ employees", (10001, None)),
+    ("self-employed", (None, None)),
+    (None, (None, None)),
+])
+def test_parse_size_range(value, expected):
+    assert parse_size_range(value) == expected
+
+@pytest.mark.parametrize("value, expected", [
+    ("United States", "US"), ("USA", "US"), ("us", "US"), ("The Netherlands", "NL"), ("DEU", "DE"),
+    ("UK", "GB"), ("England", "GB"), ("Atlantis", None), ("N/A", None), ("", None), (None, None),
+])
+def test_country_code(value, expected):
+    assert country_code(value) == expected
+
+def test_country_name_falls_back_to_code():
+    assert country_name("DE") == "Germany"
+    assert country_name("XK") == "XK"
+
+# ------------------------
+# Typed records
+# ------------------------
+def test_employee_from_coresignal():
+    record = EmployeeRecord.from_coresignal({
+        "full_name": " Ada Lovelace ", "job_title": "N/A", "location_country": "UK", "connections_count": "500+",
+    })
+
+    assert record.name == "Ada Lovelace"
+    assert record.title is None and record.company is None
+    assert (record.location, record.country_code, record.connections) == ("UK", "GB", 500)
+    assert record.to_display() == {
+        "Name": "Ada Lovelace", "Title": MISSING, "Company": MISSING, "Location": "UK", "Connections": 500,
+    }
+
+def test_company_from_coresignal():
+    record = CompanyRecord.from_coresignal({
+        "name": "Acme", "size_range": "1,001-5,000 employees", "location_hq_country": "Germany",
+        "website_main": "acme.example",
+    })
+
+    assert (record.size_min, record.size_max, record.country_code) == (1001, 5000, "DE")
+    assert record.website == "acme.example"
+    assert record.to_display()["Size"] == "1,001-5,000 employees"
+    assert record.to_display()["Industry"] == MISSING
+    assert record.to_dict()["size_min"] == 1001
+
+def test_records_are_slotted():
+    record = EmployeeRecord.from_coresignal({})
+    assert not hasattr(record, "__dict__")
+    with pytest.raises(AttributeError):
+        record.extra = 1
@@ -0,0 +1,122 @@
+import pytest
+from fastapi import HTTPException
+from records import EmployeeRecord, CompanyRecord, MISSING
+from app import (
+    TTLCache, ResultStore, records_size, connections_bucket, compute_facets, select_rows, encode_cursor, decode_cursor,
+)
+
+def employee(name, connections=None, location=None, country_code=None):
+    return EmployeeRecord(name=name, title="Engineer", company="Acme", location=location,
+                          country_code=country_code, connections=connections)
+
+def company(name, size_min=None, size_max=None):
+    label = f"{size_min}-{size_max} employees" if size_min is not None else None
+    return CompanyRecord(name=name, industry="Software", size_label=label, size_min=size_min, size_max=size_max,
+                         location=None, country_code=None, website=None)
+
+def entry(query_type, results):
+    return {"query_type": query_type, "results": results}
+
+# ------------------------
+# Cursors
+# ------------------------
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(40)) == 40
+    assert decode_cursor("") == 0
+    assert decode_cursor(None) == 0
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(-1), encode_cursor("x")])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as e:
+        decode_cursor(cursor)
+    assert e.value.status_code == 400
+
+# ------------------------
+# Filtering, sorting and facets
+# ------------------------
+def test_select_rows_sorts_missing_values_last():
+    rows = [employee("a", 10), employee("b"), employee("c", 500), employee("d", 200)]
+
+    assert [r.name for r in select_rows(entry("employee", rows), None, True, {})] == ["c", "d", "a", "b"]
+    assert [r.name for r in select_rows(entry("employee", rows), "Connections", False, {})] == ["a", "d", "c", "b"]
+    assert [r.name for r in select_rows(entry("employee", rows), "Name", True, {})] == ["d", "c", "b", "a"]
+
+def test_select_rows_sorts_company_size_numerically():
+    rows = [company("small", 11, 50), company("unknown"), company("large", 1001, 5000), company("mid", 201, 500)]
+    assert [r.name for r in select_rows(entry("company", rows), None, True, {})] == ["large", "mid", "small", "unknown"]
+
+def test_select_rows_filters_on_facet_values():
+    rows = [
+        employee("a", 10, "USA", "US"),
+        employee("b", 350, "United States", "US"),
+        employee("c", 120, "Germany", "DE"),
+        employee("d", None, "Atlantis"),
+    ]
+
+    us = select_rows(entry("employee", rows), "Name", False, {"Location": ["US"]})
+    assert [r.name for r in us] == ["a", "b"]
+    unmatched = select_rows(entry("employee", rows), "Name", False, {"Location": ["Atlantis"], "Connections": [MISSING]})
+    assert [r.name for r in unmatched] == ["d"]
+    # An empty selection is treated as "no filter" on the server
+    assert len(select_rows(entry("employee", rows), None, True, {"Location": []})) == 4
+
+def test_connections_are_bucketed():
+    assert [connections_bucket(n) for n in (None, 0, 99, 100, 299, 300, 499, 500, 10000)] == [
+        MISSING, "0-99", "0-99", "100-299", "100-299", "300-499", "300-499", "500+", "500+"
+    ]
+
+def test_facets_group_locations_by_country_code():
+    rows = [employee("a", 10, "USA", "US"), employee("b", 20, "United States", "US"), employee("c", None, "Atlantis")]
+    facets = compute_facets(rows)
+
+    assert facets["Location"] == [
+        {"value": "US", "label": "United States", "count": 2},
+        {"value": "Atlantis", "label": "Atlantis", "count": 1},
+    ]
+    assert {f["value"]: f["count"] for f in facets["Connections"]} == {"0-99": 2, MISSING: 1}
+    assert "Size" not in facets
+
+# ------------------------
+# Result store
+# ------------------------
+def test_store_evicts_least_recently_used_over_budget():
+    results = [employee(f"person {i}", i) for i in range(50)]
+    store = ResultStore(ttl_seconds=60, max_bytes=records_size(results) * 2)
+
+    first = store.put("employee", results, "")
+    second = store.put("employee", list(results), "")
+    assert store.get(first) is not None  # touching the first makes the second the eviction candidate
+    third = store.put("employee", list(results), "")
+
+    assert store.get(second) is None
+    assert store.get(first) is not None and store.get(third) is not None
+    assert store._bytes == store.get(first)["size"] + store.get(third)["size"] <= store.max_bytes
+
+def test_store_keeps_newest_entry_over_budget():
+    store = ResultStore(ttl_seconds=60, max_bytes=1)
+    handle = store.put("employee", [employee("a", 1)], "")
+    assert store.get(handle)["columns"] == list(EmployeeRecord.DISPLAY_FIELDS)
+
+def test_store_expires_entries_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.time.monotonic", lambda: now[0])
+    store = ResultStore(ttl_seconds=60, max_bytes=10 ** 9)
+    handle = store.put("employee", [employee("a", 1)], "summary")
+
+    now[0] += 59
+    assert store.get(handle)["ai_summary"] == "summary"
+    now[0] += 59  # the read above slid the expiry forward
+    assert store.get(handle) is not None
+    now[0] += 61
+    assert store.get(handle) is None
+    assert store._bytes == 0
+
+def test_upstream_cache_is_bounded_by_bytes():
+    results = [employee(f"person {i}", i) for i in range(50)]
+    cache = TTLCache(ttl_seconds=60, max_entries=100, max_bytes=records_size(results) * 2, sizeof=records_size)
+    for key in ("a", "b", "c"):
+        cache.set(key, results)
+
+    assert cache.get("a") is None
+    assert cache.get("b") is results and cache.get("c") is results
+    assert cache.stats()["bytes"] == 2 * records_size(results)
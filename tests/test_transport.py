@@ -0,0 +1,147 @@
+import time
+import asyncio
+import threading
+import concurrent.futures
+import pytest
+from aiohttp import web
+from transport import BackendTransport, TransportError, RequestCancelled
+
+# ------------------------
+# Mock backends of different speeds
+# ------------------------
+DELAYS = {"fast": 0.01, "medium": 0.2, "slow": 2.0}
+
+@pytest.fixture(scope="module")
+def backends():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def start(delay):
+        async def handler(request):
+            await asyncio.sleep(delay)
+            return web.json_response({"delay": delay, "path": request.path_qs})
+
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return runner, f"http://127.0.0.1:{port}"
+
+    started = {name: asyncio.run_coroutine_threadsafe(start(delay), loop).result() for name, delay in DELAYS.items()}
+    yield {name: url for name, (_, url) in started.items()}
+
+    for runner, _ in started.values():
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+@pytest.fixture
+def make_transport():
+    transports = []
+
+    def make(urls, **kwargs):
+        transport = BackendTransport(urls, **kwargs)
+        transports.append(transport)
+        return transport
+
+    yield make
+    for transport in transports:
+        transport.close()
+
+def wait_until_idle(transport, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while any(transport.outstanding.values()) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return transport.outstanding
+
+# ------------------------
+# Backend selection
+# ------------------------
+def test_least_outstanding_prefers_fast_backends(backends, make_transport):
+    urls = [backends["fast"], backends["medium"], backends["slow"]]
+    transport = make_transport(urls, balancer="least_outstanding")
+
+    with concurrent.futures.ThreadPoolExecutor(12) as pool:
+        used = list(pool.map(lambda _: transport.get("/search").backend, range(60)))
+
+    counts = {url: used.count(url) for url in urls}
+    assert counts[backends["fast"]] > counts[backends["medium"]] >= counts[backends["slow"]]
+    assert wait_until_idle(transport) == {url: 0 for url in urls}
+
+def test_round_robin_cycles_through_backends(backends, make_transport):
+    urls = [backends["fast"], backends["medium"]]
+    transport = make_transport(urls, balancer="round_robin")
+
+    used = [transport.get("/search").backend for _ in range(4)]
+
+    assert used == urls * 2
+
+def test_pinned_backend_bypasses_selection(backends, make_transport):
+    transport = make_transport([backends["fast"], backends["medium"]])
+
+    response = transport.get("/results/abc", params=[("location", "India"), ("location", "Germany")], backend=backends["medium"])
+
+    assert response.status_code == 200
+    assert response.backend == backends["medium"]
+    assert response.json()["path"] == "/results/abc?location=India&location=Germany"
+
+# ------------------------
+# Timeouts & cancellation
+# ------------------------
+def test_request_timeout_raises_transport_error(backends, make_transport):
+    transport = make_transport([backends["slow"]])
+
+    started = time.monotonic()
+    with pytest.raises(TransportError, match="timed out"):
+        transport.get("/search", timeout=0.2)
+
+    assert time.monotonic() - started < DELAYS["slow"]
+    assert wait_until_idle(transport) == {backends["slow"]: 0}
+
+def test_raising_from_on_tick_cancels_request(backends, make_transport):
+    transport = make_transport([backends["slow"]])
+
+    class NewSearch(Exception):
+        pass
+
+    def on_tick(elapsed):
+        if elapsed > 0.2:
+            raise NewSearch()
+
+    future = transport.submit("GET", "/search")
+    started = time.monotonic()
+    with pytest.raises(NewSearch):
+        transport.wait(future, on_tick=on_tick, tick=0.05)
+
+    assert time.monotonic() - started < DELAYS["slow"]
+    assert future.cancelled()
+    assert wait_until_idle(transport) == {backends["slow"]: 0}
+
+def test_cancelled_future_raises_request_cancelled(backends, make_transport):
+    transport = make_transport([backends["slow"]])
+
+    future = transport.submit("GET", "/search")
+    threading.Timer(0.1, future.cancel).start()
+    with pytest.raises(RequestCancelled):
+        transport.wait(future, tick=0.05)
+
+    assert wait_until_idle(transport) == {backends["slow"]: 0}
+
+def test_per_call_timeout_keeps_connect_timeout(backends, make_transport):
+    transport = make_transport([backends["fast"]], connect_timeout=0.5)
+    seen = []
+    original = transport._session.request
+
+    def spy(method, url, **kwargs):
+        seen.append(kwargs["timeout"])
+        return original(method, url, **kwargs)
+
+    transport._session.request = spy
+    transport.get("/search", timeout=5)
+
+    assert seen[0].total == 5
+    assert seen[0].sock_connect == 0.5
@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import asyncio
+import threading
+import concurrent.futures
+import aiohttp
+
+# ------------------------
+# Transport configuration
+# ------------------------
+# Comma-separated list of backend replicas, e.g. "http://10.0.0.1:8000,http://10.0.0.2:8000"
+SOURCING_API_URLS = os.getenv("SOURCING_API_URLS", "http://127.0.0.1:8000")
+SOURCING_BALANCER = os.getenv("SOURCING_BALANCER", "least_outstanding")
+SOURCING_CONNECT_TIMEOUT = float(os.getenv("SOURCING_CONNECT_TIMEOUT", "3"))
+SOURCING_REQUEST_TIMEOUT = float(os.getenv("SOURCING_REQUEST_TIMEOUT", "60"))
+SOURCING_POOL_SIZE = int(os.getenv("SOURCING_POOL_SIZE", "32"))
+
+BALANCERS = ("round_robin", "least_outstanding")
+
+class TransportError(Exception):
+    pass
+
+class RequestCancelled(TransportError):
+    pass
+
+class BackendResponse:
+    def __init__(self, status_code, data, backend, content=b""):
+        self.status_code = status_code
+        self.backend = backend
+        self.content = content
+        self._data = data
+
+    def json(self):
+        return self._data
+
+# ------------------------
+# Pooled transport to the FastAPI replicas
+# ------------------------
+class BackendTransport:
+    """Shares one keep-alive aiohttp session across all Streamlit sessions of the process.
+
+    The session lives on a private event loop thread; callers get a concurrent Future back,
+    so a request can be cancelled from the Streamlit script thread at any point."""
+
+    def __init__(self, base_urls, balancer="least_outstanding", connect_timeout=SOURCING_CONNECT_TIMEOUT,
+                 request_timeout=SOURCING_REQUEST_TIMEOUT, pool_size=SOURCING_POOL_SIZE):
+        if not base_urls:
+            raise ValueError("At least one backend URL is required")
+        if balancer not in BALANCERS:
+            raise ValueError(f"Unknown balancer {balancer!r}, expected one of {BALANCERS}")
+        self.base_urls = [url.rstrip("/") for url in base_urls]
+        self.balancer = balancer
+        self.request_timeout = request_timeout
+        self.connect_timeout = connect_timeout
+        # Only touched from the loop thread, so no lock is needed
+        self.outstanding = {url: 0 for url in self.base_urls}
+        self._next = 0
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="sourcing-transport", daemon=True)
+        self._thread.start()
+        self._session = asyncio.run_coroutine_threadsafe(
+            self._create_session(pool_size), self._loop
+        ).result()
+
+    async def _create_session(self, pool_size):
+        connector = aiohttp.TCPConnector(limit=pool_size, keepalive_timeout=30)
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout, sock_connect=self.connect_timeout)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    def _pick_backend(self):
+        # Rotating the start index makes round robin the tie-breaker for least-outstanding
+        start = self._next
+        self._next = (self._next + 1) % len(self.base_urls)
+        candidates = self.base_urls[start:] + self.base_urls[:start]
+        if self.balancer == "round_robin":
+            return candidates[0]
+        return min(candidates, key=self.outstanding.__getitem__)
+
+    async def _request(self, method, path, timeout, backend, **kwargs):
+        if backend is None:
+            backend = self._pick_backend()
+        self.outstanding[backend] += 1
+        try:
+            if timeout is not None:
+                # Only override the total; the session's connect timeout still applies
+                kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout, sock_connect=self.connect_timeout)
+            async with self._session.request(method, backend + path, **kwargs) as response:
+                content = await response.read()
+                try:
+                    data = json.loads(content) if content else None
+                except ValueError:
+                    data = None
+                return BackendResponse(response.status, data, backend, content)
+        except asyncio.TimeoutError:
+            raise TransportError(f"{method} {path} timed out on {backend}")
+        except aiohttp.ClientError as e:
+            raise TransportError(f"{method} {path} failed on {backend}: {e}")
+        finally:
+            self.outstanding[backend] -= 1
+
+    def submit(self, method, path, timeout=None, backend=None, **kwargs):
+        """Starts a request and returns a concurrent Future; cancelling it aborts the HTTP call.
+
+        Pass backend to pin the request to one replica, e.g. for state that lives in its memory."""
+        return asyncio.run_coroutine_threadsafe(self._request(method, path, timeout, backend, **kwargs), self._loop)
+
+    def wait(self, future, on_tick=None, tick=0.25):
+        """Blocks until the future completes, calling on_tick(elapsed_seconds) while waiting.
+
+        on_tick gives the caller a periodic hook to abandon the wait (e.g. by raising), in which
+        case the underlying request is cancelled."""
+        started = time.monotonic()
+        try:
+            while True:
+                try:
+                    return future.result(timeout=tick)
+                except concurrent.futures.TimeoutError:
+                    if on_tick is not None:
+                        on_tick(time.monotonic() - started)
+        except concurrent.futures.CancelledError:
+            raise RequestCancelled("Request was cancelled")
+        finally:
+            future.cancel()
+
+    def request(self, method, path, on_tick=None, **kwargs):
+        return self.wait(self.submit(method, path, **kwargs), on_tick=on_tick)
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+_transport = None
+_transport_lock = threading.Lock()
+
+def get_transport():
+    """Returns the process-wide transport, creating it from the environment on first use."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            urls = [url.strip() for url in SOURCING_API_URLS.split(",") if url.strip()]
+            _transport = BackendTransport(urls, balancer=SOURCING_BALANCER)
+        return _transport